@@ -11,35 +11,92 @@ import subprocess
 import threading
 import time
 from datetime import datetime
-from flask import Flask, request, jsonify, Response
+from flask import Flask, Blueprint, request, jsonify, Response
 from flask_cors import CORS
 import uuid
 import signal
 import queue
+from playbook_scheduler import PlaybookScheduler, ScheduleBusyError, ScheduleStoreError
 
-app = Flask(__name__)
-# Enable CORS for team access from different devices
-CORS(app, origins="*", allow_headers=["Content-Type", "Authorization"], methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
+api = Blueprint('api', __name__)
 
 # Configuration
 ANSIBLE_DIR = "/ansible"
 PLAYBOOKS_DIR = f"{ANSIBLE_DIR}/infrastructure/playbooks"
 LOGS_DIR = f"{ANSIBLE_DIR}/logs"
 INVENTORY_FILE = f"{ANSIBLE_DIR}/infrastructure/inventory/hosts"
+# Persistent state such as schedules lives in a state directory, not alongside logs
+STATE_DIR = os.getenv('ANSIBLE_STATE_DIR', os.path.join(
+    os.getenv('XDG_STATE_HOME', os.path.expanduser('~/.local/state')), 'ansible-dashboard'))
+SCHEDULES_FILE = os.getenv('ANSIBLE_SCHEDULES_FILE', os.path.join(STATE_DIR, 'schedules.json'))
 
-# Ensure log directory exists
+# Log directory, created by init_state() rather than at import time
 log_dir = "/home/abid/Project/wanderlist-app/ansible/logs"
-os.makedirs(log_dir, exist_ok=True)
 
 # Global storage for active executions
 active_executions = {}
 execution_logs = {}
 
+# Startup state, filled in by init_state() in the background
+state_ready = threading.Event()
+startup_info = {
+    "started_at": None,
+    "ready_at": None,
+    "error": None,
+    "attempts": 0
+}
+
+# Backoff between failed initialization attempts
+INIT_RETRY_SECONDS = 1
+INIT_RETRY_MAX_SECONDS = 30
+
+def init_state():
+    """Prepare directories and check paths needed to run playbooks, returning True once ready"""
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        startup_info["playbooks_available"] = os.path.exists(PLAYBOOKS_DIR)
+        startup_info["inventory_available"] = os.path.exists(INVENTORY_FILE)
+        scheduler.start()
+        startup_info["ready_at"] = datetime.now().isoformat()
+        startup_info["error"] = None
+        state_ready.set()
+        return True
+    except Exception as e:
+        startup_info["error"] = str(e)
+        print(f"Warning: Startup initialization failed: {e}")
+        return False
+
+def init_state_with_retry():
+    """Keep calling init_state() with exponential backoff until it succeeds"""
+    delay = INIT_RETRY_SECONDS
+    while True:
+        startup_info["attempts"] += 1
+        if init_state():
+            return
+        time.sleep(delay)
+        delay = min(delay * 2, INIT_RETRY_MAX_SECONDS)
+
+def create_app():
+    """Create the Flask app and initialize state in a background thread"""
+    app = Flask(__name__)
+    # Enable CORS for team access from different devices
+    CORS(app, origins="*", allow_headers=["Content-Type", "Authorization"], methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
+    app.register_blueprint(api)
+
+    # Serve health checks immediately; readiness is reported via /api/ready
+    startup_info["started_at"] = datetime.now().isoformat()
+    thread = threading.Thread(target=init_state_with_retry)
+    thread.daemon = True
+    thread.start()
+
+    return app
+
 class PlaybookExecution:
-    def __init__(self, execution_id, playbook, extra_vars=None):
+    def __init__(self, execution_id, playbook, extra_vars=None, schedule_id=None):
         self.execution_id = execution_id
         self.playbook = playbook
         self.extra_vars = extra_vars or {}
+        self.schedule_id = schedule_id
         self.status = "pending"
         self.start_time = datetime.now()
         self.end_time = None
@@ -52,23 +109,64 @@ class PlaybookExecution:
             "execution_id": self.execution_id,
             "playbook": self.playbook,
             "extra_vars": self.extra_vars,
+            "schedule_id": self.schedule_id,
             "status": self.status,
             "start_time": self.start_time.isoformat(),
             "end_time": self.end_time.isoformat() if self.end_time else None,
             "output_lines": len(self.output_lines)
         }
 
-@app.route('/api/health', methods=['GET'])
+def start_execution(playbook, extra_vars=None, schedule_id=None):
+    """Register a playbook execution and run it in a background thread"""
+    execution_id = str(uuid.uuid4())
+    
+    execution = PlaybookExecution(execution_id, playbook, extra_vars, schedule_id)
+    active_executions[execution_id] = execution
+    execution_logs[execution_id] = []
+    
+    thread = threading.Thread(target=run_playbook, args=(execution,))
+    thread.daemon = True
+    thread.start()
+    
+    return execution
+
+def launch_scheduled(schedule):
+    """Start a scheduled run through the same tracking as /api/execute"""
+    if not os.path.exists(os.path.join(PLAYBOOKS_DIR, schedule.playbook)):
+        raise FileNotFoundError(f"Playbook {schedule.playbook} not found")
+    return start_execution(schedule.playbook, schedule.extra_vars, schedule.schedule_id).execution_id
+
+def is_execution_running(execution_id):
+    execution = active_executions.get(execution_id)
+    return execution is not None and execution.status in ['pending', 'running']
+
+scheduler = PlaybookScheduler(SCHEDULES_FILE, launch=launch_scheduled, is_running=is_execution_running)
+
+@api.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Liveness endpoint, answers as soon as the server is accepting requests"""
     return jsonify({
-        "status": "healthy",
+        "status": "degraded" if startup_info["error"] else "healthy",
         "timestamp": datetime.now().isoformat(),
         "ansible_dir": ANSIBLE_DIR,
-        "playbooks_available": os.path.exists(PLAYBOOKS_DIR)
+        "ready": state_ready.is_set(),
+        "init_error": startup_info["error"]
     })
 
-@app.route('/api/playbooks', methods=['GET'])
+@api.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint, returns 503 until startup initialization has finished"""
+    status_code = 200 if state_ready.is_set() else 503
+    return jsonify({
+        "status": "ready" if state_ready.is_set() else "starting",
+        "timestamp": datetime.now().isoformat(),
+        **startup_info,
+        "schedules_file": scheduler.schedules_file,
+        "schedules_load_error": scheduler.load_error,
+        "schedules_save_error": scheduler.save_error
+    }), status_code
+
+@api.route('/api/playbooks', methods=['GET'])
 def list_playbooks():
     """List available Ansible playbooks"""
     try:
@@ -90,7 +188,7 @@ def list_playbooks():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/inventory', methods=['GET'])
+@api.route('/api/inventory', methods=['GET'])
 def get_inventory():
     """Get Ansible inventory information"""
     try:
@@ -103,10 +201,13 @@ def get_inventory():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/execute', methods=['POST'])
+@api.route('/api/execute', methods=['POST'])
 def execute_playbook():
     """Execute an Ansible playbook"""
     try:
+        if not state_ready.is_set():
+            return jsonify({"error": "Server is still starting up"}), 503
+
         data = request.get_json()
         playbook = data.get('playbook')
         extra_vars = data.get('extra_vars', {})
@@ -118,21 +219,10 @@ def execute_playbook():
         if not os.path.exists(playbook_path):
             return jsonify({"error": f"Playbook {playbook} not found"}), 404
             
-        # Generate unique execution ID
-        execution_id = str(uuid.uuid4())
-        
-        # Create execution object
-        execution = PlaybookExecution(execution_id, playbook, extra_vars)
-        active_executions[execution_id] = execution
-        execution_logs[execution_id] = []
-        
-        # Start playbook execution in background thread
-        thread = threading.Thread(target=run_playbook, args=(execution,))
-        thread.daemon = True
-        thread.start()
+        execution = start_execution(playbook, extra_vars)
         
         return jsonify({
-            "execution_id": execution_id,
+            "execution_id": execution.execution_id,
             "status": "started",
             "playbook": playbook,
             "message": "Playbook execution started"
@@ -216,13 +306,13 @@ def run_playbook(execution):
         execution.output_lines.append(error_log)
         execution_logs[execution.execution_id].append(error_log)
 
-@app.route('/api/executions', methods=['GET'])
+@api.route('/api/executions', methods=['GET'])
 def list_executions():
     """List all playbook executions"""
     executions = [exec.to_dict() for exec in active_executions.values()]
     return jsonify({"executions": executions})
 
-@app.route('/api/executions/<execution_id>', methods=['GET'])
+@api.route('/api/executions/<execution_id>', methods=['GET'])
 def get_execution_status(execution_id):
     """Get status of a specific execution"""
     if execution_id not in active_executions:
@@ -231,7 +321,7 @@ def get_execution_status(execution_id):
     execution = active_executions[execution_id]
     return jsonify(execution.to_dict())
 
-@app.route('/api/executions/<execution_id>/logs', methods=['GET'])
+@api.route('/api/executions/<execution_id>/logs', methods=['GET'])
 def get_execution_logs(execution_id):
     """Get logs for a specific execution"""
     if execution_id not in execution_logs:
@@ -240,7 +330,7 @@ def get_execution_logs(execution_id):
     logs = execution_logs[execution_id]
     return jsonify({"logs": logs, "total_lines": len(logs)})
 
-@app.route('/api/executions/<execution_id>/logs/stream')
+@api.route('/api/executions/<execution_id>/logs/stream')
 def stream_execution_logs(execution_id):
     """Stream logs for a specific execution using Server-Sent Events"""
     if execution_id not in execution_logs:
@@ -267,7 +357,7 @@ def stream_execution_logs(execution_id):
     
     return Response(generate(), mimetype='text/plain')
 
-@app.route('/api/executions/<execution_id>/stop', methods=['POST'])
+@api.route('/api/executions/<execution_id>/stop', methods=['POST'])
 def stop_execution(execution_id):
     """Stop a running execution"""
     if execution_id not in active_executions:
@@ -295,7 +385,144 @@ def stop_execution(execution_id):
     else:
         return jsonify({"error": "Execution is not running"}), 400
 
-@app.route('/api/command', methods=['POST'])
+@api.route('/api/schedules', methods=['GET'])
+def list_schedules():
+    """List all playbook schedules"""
+    if not state_ready.is_set():
+        return jsonify({"error": "Server is still starting up"}), 503
+    schedules = [schedule.to_dict() for schedule in scheduler.list_schedules()]
+    return jsonify({"schedules": schedules})
+
+def validate_schedule_fields(data):
+    """Return an error message if schedule fields have the wrong JSON types"""
+    if not isinstance(data.get('playbook'), str):
+        return "'playbook' must be a string"
+    if data.get('cron') is not None and not isinstance(data['cron'], str):
+        return "'cron' must be a string"
+    for field in ['interval_seconds', 'jitter_seconds']:
+        value = data.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            return f"'{field}' must be a number"
+    if not isinstance(data.get('enabled', True), bool):
+        return "'enabled' must be true or false"
+    if not isinstance(data.get('extra_vars', {}), dict):
+        return "'extra_vars' must be an object"
+    if data.get('name') is not None and not isinstance(data['name'], str):
+        return "'name' must be a string"
+    return None
+
+@api.route('/api/schedules', methods=['POST'])
+def create_schedule():
+    """Create a cron or interval schedule for a playbook"""
+    try:
+        if not state_ready.is_set():
+            return jsonify({"error": "Server is still starting up"}), 503
+
+        data = request.get_json()
+        playbook = data.get('playbook')
+        
+        if not playbook:
+            return jsonify({"error": "Playbook name is required"}), 400
+        
+        error = validate_schedule_fields(data)
+        if error:
+            return jsonify({"error": error}), 400
+            
+        playbook_path = os.path.join(PLAYBOOKS_DIR, playbook)
+        if not os.path.exists(playbook_path):
+            return jsonify({"error": f"Playbook {playbook} not found"}), 404
+        
+        schedule = scheduler.add_schedule(
+            playbook,
+            cron=data.get('cron'),
+            interval_seconds=data.get('interval_seconds'),
+            extra_vars=data.get('extra_vars', {}),
+            name=data.get('name'),
+            jitter_seconds=data.get('jitter_seconds') or 0,
+            overlap=data.get('overlap', 'skip'),
+            enabled=data.get('enabled', True)
+        )
+        return jsonify(schedule.to_dict()), 201
+        
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except ScheduleStoreError as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/api/schedules/<schedule_id>', methods=['GET'])
+def get_schedule(schedule_id):
+    """Get a specific schedule"""
+    if not state_ready.is_set():
+        return jsonify({"error": "Server is still starting up"}), 503
+    schedule = scheduler.get_schedule(schedule_id)
+    if schedule is None:
+        return jsonify({"error": "Schedule not found"}), 404
+    return jsonify(schedule.to_dict())
+
+@api.route('/api/schedules/<schedule_id>', methods=['DELETE'])
+def delete_schedule(schedule_id):
+    """Delete a schedule"""
+    if not state_ready.is_set():
+        return jsonify({"error": "Server is still starting up"}), 503
+    try:
+        removed = scheduler.remove_schedule(schedule_id)
+    except ScheduleStoreError as e:
+        return jsonify({"error": str(e)}), 500
+    if not removed:
+        return jsonify({"error": "Schedule not found"}), 404
+    return jsonify({"message": "Schedule deleted"})
+
+@api.route('/api/schedules/<schedule_id>/enable', methods=['POST'])
+def enable_schedule(schedule_id):
+    """Resume a paused schedule"""
+    if not state_ready.is_set():
+        return jsonify({"error": "Server is still starting up"}), 503
+    try:
+        schedule = scheduler.set_enabled(schedule_id, True)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except ScheduleStoreError as e:
+        return jsonify({"error": str(e)}), 500
+    if schedule is None:
+        return jsonify({"error": "Schedule not found"}), 404
+    return jsonify(schedule.to_dict())
+
+@api.route('/api/schedules/<schedule_id>/disable', methods=['POST'])
+def disable_schedule(schedule_id):
+    """Pause a schedule without deleting it"""
+    if not state_ready.is_set():
+        return jsonify({"error": "Server is still starting up"}), 503
+    try:
+        schedule = scheduler.set_enabled(schedule_id, False)
+    except ScheduleStoreError as e:
+        return jsonify({"error": str(e)}), 500
+    if schedule is None:
+        return jsonify({"error": "Schedule not found"}), 404
+    return jsonify(schedule.to_dict())
+
+@api.route('/api/schedules/<schedule_id>/run', methods=['POST'])
+def run_schedule_now(schedule_id):
+    """Trigger a scheduled playbook immediately"""
+    if not state_ready.is_set():
+        return jsonify({"error": "Server is still starting up"}), 503
+    try:
+        schedule = scheduler.run_now(schedule_id)
+    except ScheduleBusyError as e:
+        return jsonify({"error": str(e)}), 409
+    if schedule is None:
+        return jsonify({"error": "Schedule not found"}), 404
+    if schedule.last_error:
+        return jsonify({"error": schedule.last_error}), 500
+    return jsonify({
+        "execution_id": schedule.last_execution_id,
+        "status": "started",
+        "playbook": schedule.playbook,
+        "schedule_id": schedule.schedule_id
+    })
+
+@api.route('/api/command', methods=['POST'])
 def execute_command():
     """Execute a direct shell command"""
     try:
@@ -371,17 +598,26 @@ def execute_command():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/command/<execution_id>/logs', methods=['GET'])
+@api.route('/api/command/<execution_id>/logs', methods=['GET'])
 def get_command_logs(execution_id):
     """Get logs for a specific command execution"""
     logs = execution_logs.get(execution_id, [])
     return jsonify({"logs": logs})
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Ansible Dashboard API Server")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8094)
+    args = parser.parse_args()
+
+    app = create_app()
+
     print(f"🚀 Starting Ansible Dashboard API Server...")
     print(f"📁 Ansible Directory: {ANSIBLE_DIR}")
     print(f"📚 Playbooks Directory: {PLAYBOOKS_DIR}")
     print(f"📋 Inventory File: {INVENTORY_FILE}")
-    print(f"🌐 Server will be available at: http://localhost:8094")
+    print(f"🌐 Server will be available at: http://localhost:{args.port}")
     
-    app.run(host='0.0.0.0', port=8094, debug=True, threaded=True)
\ No newline at end of file
+    # The reloader would run create_app() in a second process and start a second scheduler
+    app.run(host=args.host, port=args.port, debug=True, use_reloader=False, threaded=True)
\ No newline at end of file
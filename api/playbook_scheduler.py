@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Playbook Scheduler for Ansible Dashboard
+Runs playbooks on cron-like or interval triggers using a single timer thread
+"""
+
+import os
+import json
+import heapq
+import math
+import random
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Shorthand cron expressions
+CRON_ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *'
+}
+
+OVERLAP_POLICIES = ['skip', 'coalesce']
+
+# How often a coalesced run re-checks whether the previous run has finished
+COALESCE_RETRY_SECONDS = 5
+
+# Upper bound for interval_seconds and jitter_seconds (one year)
+MAX_SCHEDULE_SECONDS = 366 * 24 * 3600
+
+# Pause after an unexpected error in the timer loop before carrying on
+ERROR_BACKOFF_SECONDS = 1
+
+# Stale heap entries tolerated beyond the live ones before the heap is rebuilt
+HEAP_COMPACT_SLACK = 64
+
+class ScheduleBusyError(Exception):
+    """Raised when a schedule's previous run is still active"""
+
+class ScheduleStoreError(Exception):
+    """Raised when the schedules file cannot be read or written"""
+
+def _parse_cron_field(field, low, high):
+    """Parse one cron field (e.g. '*/15', '1-5', '0,30') into a set of values"""
+    values = set()
+    for part in field.split(','):
+        step = 1
+        has_step = '/' in part
+        if has_step:
+            part, step_str = part.split('/', 1)
+            step = int(step_str)
+            if step < 1:
+                raise ValueError(f"Invalid step in cron field '{field}'")
+
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(value) for value in part.split('-', 1))
+        else:
+            start = int(part)
+            end = high if has_step else start
+
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field '{field}' out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+class CronTrigger:
+    """Standard 5-field cron expression: minute hour day-of-month month day-of-week"""
+
+    def __init__(self, expression):
+        self.expression = expression
+        fields = CRON_ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression '{expression}' must have 5 fields")
+
+        try:
+            self.minutes = _parse_cron_field(fields[0], 0, 59)
+            self.hours = _parse_cron_field(fields[1], 0, 23)
+            self.days = _parse_cron_field(fields[2], 1, 31)
+            self.months = _parse_cron_field(fields[3], 1, 12)
+            # Both 0 and 7 mean Sunday
+            self.weekdays = {day % 7 for day in _parse_cron_field(fields[4], 0, 7)}
+        except ValueError as e:
+            raise ValueError(f"Invalid cron expression '{expression}': {e}")
+
+        # Like cron, restricting both day fields matches either of them
+        self.days_restricted = not fields[2].startswith('*')
+        self.weekdays_restricted = not fields[4].startswith('*')
+
+    def _day_matches(self, dt):
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, after):
+        """Return the first matching timestamp strictly after the given one"""
+        dt = datetime.fromtimestamp(after).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+            elif dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt.timestamp()
+
+        raise ValueError(f"Cron expression '{self.expression}' never matches")
+
+class IntervalTrigger:
+    """Fixed interval between runs"""
+
+    def __init__(self, seconds):
+        self.seconds = float(seconds)
+        if self.seconds <= 0:
+            raise ValueError("Interval must be greater than zero")
+
+    def next_after(self, after):
+        return after + self.seconds
+
+class Schedule:
+    def __init__(self, schedule_id, playbook, cron=None, interval_seconds=None,
+                 extra_vars=None, name=None, jitter_seconds=0, overlap='skip', enabled=True):
+        if bool(cron) == bool(interval_seconds):
+            raise ValueError("Exactly one of 'cron' or 'interval_seconds' is required")
+        if overlap not in OVERLAP_POLICIES:
+            raise ValueError(f"Overlap policy must be one of: {', '.join(OVERLAP_POLICIES)}")
+        for field, value in [('interval_seconds', interval_seconds), ('jitter_seconds', jitter_seconds)]:
+            if value is not None and not (math.isfinite(float(value)) and 0 <= float(value) <= MAX_SCHEDULE_SECONDS):
+                raise ValueError(f"'{field}' must be between 0 and {MAX_SCHEDULE_SECONDS} seconds")
+
+        self.schedule_id = schedule_id
+        self.playbook = playbook
+        self.name = name or playbook
+        self.cron = cron
+        self.interval_seconds = interval_seconds
+        self.trigger = CronTrigger(cron) if cron else IntervalTrigger(interval_seconds)
+        self.extra_vars = extra_vars or {}
+        self.jitter_seconds = float(jitter_seconds)
+        self.overlap = overlap
+        self.enabled = enabled
+        self.created = datetime.now().isoformat()
+
+        self.last_run = None
+        self.last_execution_id = None
+        self.last_error = None
+        self.run_count = 0
+        self.skipped_count = 0
+        self.coalesced_count = 0
+
+        # Runtime state, not persisted
+        self.generation = 0
+        self.next_base = None
+        self.next_run = None
+        self.pending = False
+
+    def to_dict(self):
+        return {
+            "schedule_id": self.schedule_id,
+            "name": self.name,
+            "playbook": self.playbook,
+            "extra_vars": self.extra_vars,
+            "cron": self.cron,
+            "interval_seconds": self.interval_seconds,
+            "jitter_seconds": self.jitter_seconds,
+            "overlap": self.overlap,
+            "enabled": self.enabled,
+            "created": self.created,
+            "last_run": self.last_run,
+            "last_execution_id": self.last_execution_id,
+            "last_error": self.last_error,
+            "run_count": self.run_count,
+            "skipped_count": self.skipped_count,
+            "coalesced_count": self.coalesced_count,
+            "next_run": datetime.fromtimestamp(self.next_run).isoformat() if self.next_run else None,
+            "pending": self.pending
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        schedule = cls(
+            data['schedule_id'],
+            data['playbook'],
+            cron=data.get('cron'),
+            interval_seconds=data.get('interval_seconds'),
+            extra_vars=data.get('extra_vars'),
+            name=data.get('name'),
+            jitter_seconds=data.get('jitter_seconds', 0),
+            overlap=data.get('overlap', 'skip'),
+            enabled=data.get('enabled', True)
+        )
+        for key in ['created', 'last_run', 'last_execution_id', 'last_error',
+                    'run_count', 'skipped_count', 'coalesced_count']:
+            if key in data:
+                setattr(schedule, key, data[key])
+        return schedule
+
+class PlaybookScheduler:
+    """
+    Keeps every pending trigger in one heap ordered by due time, so a single
+    thread sleeps until the earliest run instead of polling each schedule.
+    Cancelled or rescheduled entries are left in the heap and dropped when
+    popped, using a per-schedule generation counter.
+    """
+
+    def __init__(self, schedules_file, launch, is_running):
+        self.schedules_file = schedules_file
+        self.launch = launch
+        self.is_running = is_running
+        self.schedules = {}
+        self._heap = []
+        self._counter = 0
+        self._cond = threading.Condition(threading.RLock())
+        self._thread = None
+        self._stopped = False
+        self.load_error = None
+        self.save_error = None
+
+    def load_schedules(self):
+        """Load schedules from file, moving an unparseable file aside"""
+        if not os.path.exists(self.schedules_file):
+            return
+
+        try:
+            with open(self.schedules_file, 'r') as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or not isinstance(data.get('schedules', []), list):
+                raise ValueError("expected an object with a 'schedules' list")
+        except ValueError as e:
+            # Keep the damaged file for inspection rather than overwriting it on the next save
+            backup = f"{self.schedules_file}.corrupt-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            try:
+                os.replace(self.schedules_file, backup)
+            except OSError as move_error:
+                raise ScheduleStoreError(f"Could not move unreadable schedules file aside: {move_error}")
+            self.load_error = f"Could not parse {self.schedules_file} ({e}); moved it to {backup}"
+            print(f"Warning: {self.load_error}")
+            return
+        except OSError as e:
+            raise ScheduleStoreError(f"Could not read schedules: {e}")
+
+        for item in data.get('schedules', []):
+            try:
+                schedule = Schedule.from_dict(item)
+                self.schedules[schedule.schedule_id] = schedule
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                schedule_id = item.get('schedule_id') if isinstance(item, dict) else None
+                print(f"Warning: Skipping invalid schedule {schedule_id}: {e}")
+
+    def save_schedules(self):
+        """Atomically write schedules to file, raising ScheduleStoreError on failure"""
+        directory = os.path.dirname(os.path.abspath(self.schedules_file))
+        temp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.schedules-', suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({
+                    'schedules': [
+                        {key: value for key, value in schedule.to_dict().items()
+                         if key not in ('next_run', 'pending')}
+                        for schedule in self.schedules.values()
+                    ],
+                    'last_updated': datetime.now().isoformat()
+                }, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.schedules_file)
+            temp_path = None
+        except (OSError, TypeError, ValueError) as e:
+            self.save_error = f"Could not save schedules: {e}"
+            raise ScheduleStoreError(self.save_error)
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+        self.save_error = None
+
+    def _save_after_run(self):
+        """Persist run bookkeeping from the timer thread, where there is no caller to report to"""
+        try:
+            self.save_schedules()
+        except ScheduleStoreError as e:
+            print(f"Warning: {e}")
+
+    def start(self):
+        """Load persisted schedules and start the timer thread"""
+        with self._cond:
+            if self._thread:
+                return
+            self.load_schedules()
+            for schedule in self.schedules.values():
+                if schedule.enabled:
+                    try:
+                        self._arm(schedule, time.time())
+                    except ValueError as e:
+                        # Keep serving other schedules; this one stays unarmed
+                        schedule.last_error = str(e)
+                        print(f"Warning: Not scheduling {schedule.name}: {e}")
+
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _push(self, run_at, schedule, kind):
+        self._counter += 1
+        heapq.heappush(self._heap, (run_at, self._counter, schedule.schedule_id, schedule.generation, kind))
+        # Each schedule has at most a 'due' and a 'retry' entry live; anything beyond
+        # that was left behind by deletes or enable/disable cycles
+        if len(self._heap) > 2 * len(self.schedules) + HEAP_COMPACT_SLACK:
+            self._compact()
+        self._cond.notify()
+
+    def _compact(self):
+        """Drop heap entries whose schedule was deleted, disabled or re-armed"""
+        live = []
+        for entry in self._heap:
+            schedule = self.schedules.get(entry[2])
+            if schedule is not None and schedule.enabled and schedule.generation == entry[3]:
+                live.append(entry)
+        heapq.heapify(live)
+        self._heap = live
+
+    def _arm(self, schedule, now):
+        """Queue the next regular run of a schedule, with jitter applied"""
+        # Step from the previous un-jittered time so jitter never drifts the schedule,
+        # and skip any runs that were missed while the server was down
+        base = schedule.trigger.next_after(schedule.next_base or now)
+        if base <= now:
+            base = schedule.trigger.next_after(now)
+        schedule.next_base = base
+        schedule.next_run = base + random.uniform(0, schedule.jitter_seconds)
+        self._push(schedule.next_run, schedule, 'due')
+
+    def _run(self):
+        with self._cond:
+            while not self._stopped:
+                try:
+                    self._run_next()
+                except Exception as e:
+                    # Never let one bad entry stop every other schedule
+                    print(f"Warning: Scheduler loop error: {e}")
+                    self._cond.wait(ERROR_BACKOFF_SECONDS)
+
+    def _run_next(self):
+        """Wait for the earliest heap entry and fire it once it is due"""
+        if not self._heap:
+            self._cond.wait()
+            return
+
+        run_at, _, schedule_id, generation, kind = self._heap[0]
+        delay = run_at - time.time()
+        if delay > 0:
+            self._cond.wait(min(delay, threading.TIMEOUT_MAX))
+            return
+
+        heapq.heappop(self._heap)
+        schedule = self.schedules.get(schedule_id)
+        if schedule is None or not schedule.enabled or schedule.generation != generation:
+            return
+
+        try:
+            self._fire(schedule, kind)
+        except Exception as e:
+            schedule.last_error = str(e)
+            print(f"Warning: Scheduled run of {schedule.name} failed: {e}")
+
+    def _fire(self, schedule, kind):
+        if kind == 'due':
+            self._arm(schedule, time.time())
+
+        previous_running = schedule.last_execution_id and self.is_running(schedule.last_execution_id)
+
+        if kind == 'retry':
+            if not schedule.pending:
+                return
+            if previous_running:
+                self._push(time.time() + COALESCE_RETRY_SECONDS, schedule, 'retry')
+                return
+        elif previous_running:
+            if schedule.overlap == 'skip':
+                schedule.skipped_count += 1
+            elif schedule.pending:
+                schedule.coalesced_count += 1
+            else:
+                schedule.pending = True
+                self._push(time.time() + COALESCE_RETRY_SECONDS, schedule, 'retry')
+            self._save_after_run()
+            return
+
+        self._start_run(schedule)
+
+    def _start_run(self, schedule):
+        schedule.pending = False
+        schedule.last_run = datetime.now().isoformat()
+        try:
+            schedule.last_execution_id = self.launch(schedule)
+            schedule.last_error = None
+            schedule.run_count += 1
+        except Exception as e:
+            schedule.last_error = str(e)
+        self._save_after_run()
+
+    def add_schedule(self, playbook, **options):
+        """Create a schedule and queue its first run"""
+        with self._cond:
+            schedule = Schedule(str(uuid.uuid4()), playbook, **options)
+            # Fail before storing anything if the trigger can never fire
+            schedule.trigger.next_after(time.time())
+            self.schedules[schedule.schedule_id] = schedule
+            try:
+                self.save_schedules()
+            except ScheduleStoreError:
+                del self.schedules[schedule.schedule_id]
+                raise
+            if schedule.enabled:
+                self._arm(schedule, time.time())
+            return schedule
+
+    def remove_schedule(self, schedule_id):
+        with self._cond:
+            schedule = self.schedules.pop(schedule_id, None)
+            if schedule is None:
+                return False
+            try:
+                self.save_schedules()
+            except ScheduleStoreError:
+                self.schedules[schedule_id] = schedule
+                raise
+            schedule.generation += 1
+            return True
+
+    def set_enabled(self, schedule_id, enabled):
+        with self._cond:
+            schedule = self.schedules.get(schedule_id)
+            if schedule is None:
+                return None
+            if schedule.enabled != enabled:
+                if enabled:
+                    # Raises ValueError before any state changes if it can never fire
+                    schedule.trigger.next_after(time.time())
+                schedule.enabled = enabled
+                try:
+                    self.save_schedules()
+                except ScheduleStoreError:
+                    schedule.enabled = not enabled
+                    raise
+                schedule.generation += 1
+                schedule.next_base = None
+                schedule.next_run = None
+                schedule.pending = False
+                if enabled:
+                    self._arm(schedule, time.time())
+            return schedule
+
+    def run_now(self, schedule_id):
+        """Start a schedule's playbook immediately, outside its trigger"""
+        with self._cond:
+            schedule = self.schedules.get(schedule_id)
+            if schedule is None:
+                return None
+            if schedule.last_execution_id and self.is_running(schedule.last_execution_id):
+                raise ScheduleBusyError(f"Schedule {schedule.name} is already running")
+            self._start_run(schedule)
+            return schedule
+
+    def get_schedule(self, schedule_id):
+        with self._cond:
+            return self.schedules.get(schedule_id)
+
+    def list_schedules(self):
+        with self._cond:
+            return list(self.schedules.values())
@@ -4,9 +4,10 @@ import os
 sys.path.append('/home/abid/Project/ansible-showcase/api')
 
 # Import the original API server
-from api_server import app
+from api_server import create_app
 
 if __name__ == '__main__':
+    app = create_app()
     print("🤖 Starting API server for team access...")
     print("🌐 Binding to 0.0.0.0:8094 for external access")
     app.run(host='0.0.0.0', port=8094, debug=False)
@@ -8,6 +8,7 @@ import os
 import hashlib
 import secrets
 import json
+import threading
 from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify, make_response
@@ -40,7 +41,17 @@ class TeamAuth:
     def __init__(self):
         self.active_tokens = {}
         self.team_members = DEFAULT_TEAM.copy()
-        self.load_tokens()
+        self.loaded = False
+        self._load_lock = threading.Lock()
+    
+    def ensure_loaded(self):
+        """Load tokens from file on first use instead of at import time"""
+        if self.loaded:
+            return
+        with self._load_lock:
+            if not self.loaded:
+                self.load_tokens()
+                self.loaded = True
     
     def load_tokens(self):
         """Load active tokens from file"""
@@ -68,6 +79,7 @@ class TeamAuth:
     
     def authenticate(self, username, password):
         """Authenticate user credentials"""
+        self.ensure_loaded()
         if username not in self.team_members:
             return None
         
@@ -95,6 +107,7 @@ class TeamAuth:
         if not AUTH_ENABLED:
             return True, {'username': 'anonymous', 'role': 'admin'}
         
+        self.ensure_loaded()
         if token not in self.active_tokens:
             return False, None
         
@@ -111,6 +124,7 @@ class TeamAuth:
     
     def revoke_token(self, token):
         """Revoke authentication token"""
+        self.ensure_loaded()
         if token in self.active_tokens:
             del self.active_tokens[token]
             self.save_tokens()
@@ -119,6 +133,7 @@ class TeamAuth:
     
     def add_team_member(self, username, password, role='viewer', email=''):
         """Add new team member"""
+        self.ensure_loaded()
         password_hash = hashlib.sha256(password.encode()).hexdigest()
         self.team_members[username] = {
             'password_hash': password_hash,
@@ -129,6 +144,7 @@ class TeamAuth:
     
     def list_team_members(self):
         """List all team members (without passwords)"""
+        self.ensure_loaded()
         return {
             username: {
                 'role': data['role'],
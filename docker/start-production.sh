@@ -53,12 +53,33 @@ cd /app/api
 python3 api_server.py --host ${API_HOST} --port ${API_PORT} > /var/log/ansible/api.log 2>&1 &
 API_PID=$!
 
-# Wait for API to start
-sleep 5
+# Wait for API to answer health checks (the API initializes its state in the background)
+for i in $(seq 1 50); do
+    if curl -sf http://localhost:${API_PORT}/api/health > /dev/null 2>&1; then
+        break
+    fi
+    kill -0 ${API_PID} 2>/dev/null || break
+    sleep 0.1
+done
 
 # Check if API is running
 if kill -0 ${API_PID} 2>/dev/null; then
     print_status "✅ API server started successfully (PID: ${API_PID})"
+
+    # Wait for background initialization; keep going but make a stuck startup visible
+    API_READY=false
+    for i in $(seq 1 60); do
+        if curl -sf http://localhost:${API_PORT}/api/ready > /dev/null 2>&1; then
+            API_READY=true
+            break
+        fi
+        sleep 1
+    done
+    if [[ "${API_READY}" == "true" ]]; then
+        print_status "✅ API server is ready"
+    else
+        print_warning "⚠️ API server is not ready after 60s: $(curl -s http://localhost:${API_PORT}/api/ready)"
+    fi
 else
     print_error "❌ Failed to start API server"
     exit 1
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api')
+sys.path.insert(0, API_DIR)
+
+@pytest.fixture
+def api_server(tmp_path, monkeypatch):
+    """api_server module pointed at temporary directories, with startup state reset"""
+    import api_server
+    from playbook_scheduler import PlaybookScheduler
+
+    playbooks_dir = tmp_path / 'playbooks'
+    playbooks_dir.mkdir()
+    monkeypatch.setattr(api_server, 'log_dir', str(tmp_path / 'logs'))
+    monkeypatch.setattr(api_server, 'PLAYBOOKS_DIR', str(playbooks_dir))
+    monkeypatch.setattr(api_server, 'INVENTORY_FILE', str(tmp_path / 'hosts'))
+    monkeypatch.setattr(api_server, 'startup_info', {"started_at": None, "ready_at": None, "error": None, "attempts": 0})
+    scheduler = PlaybookScheduler(
+        str(tmp_path / 'schedules.json'),
+        launch=api_server.launch_scheduled,
+        is_running=api_server.is_execution_running
+    )
+    monkeypatch.setattr(api_server, 'scheduler', scheduler)
+    api_server.state_ready.clear()
+
+    yield api_server
+
+    scheduler.stop()
+    api_server.state_ready.clear()
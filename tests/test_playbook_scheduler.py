@@ -0,0 +1,378 @@
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+import playbook_scheduler
+from playbook_scheduler import (
+    CronTrigger, IntervalTrigger, PlaybookScheduler, Schedule, ScheduleBusyError, ScheduleStoreError,
+    _parse_cron_field
+)
+
+def ts(*args):
+    return datetime(*args).timestamp()
+
+def next_run(expression, *after):
+    return datetime.fromtimestamp(CronTrigger(expression).next_after(ts(*after)))
+
+@pytest.mark.parametrize("field, low, high, expected", [
+    ('*/15', 0, 59, {0, 15, 30, 45}),
+    ('1-5', 0, 6, {1, 2, 3, 4, 5}),
+    ('10-20/5', 0, 59, {10, 15, 20}),
+    ('5/20', 0, 59, {5, 25, 45}),
+    ('0,30', 0, 59, {0, 30}),
+    ('*', 1, 12, set(range(1, 13)))
+])
+def test_parse_cron_field(field, low, high, expected):
+    assert _parse_cron_field(field, low, high) == expected
+
+@pytest.mark.parametrize("field", ['60', '5-1', '*/0', 'x', '1-'])
+def test_parse_cron_field_rejects_invalid(field):
+    with pytest.raises(ValueError):
+        _parse_cron_field(field, 0, 59)
+
+@pytest.mark.parametrize("expression", ['61 * * * *', '* * * *', 'a * * * *', '* * 0 * *', '* * * 13 *', '* * * * 8'])
+def test_cron_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronTrigger(expression)
+
+def test_cron_steps_and_ranges():
+    # 2026-10-17 is a Saturday
+    assert next_run('*/15 * * * *', 2026, 10, 17, 12, 7) == datetime(2026, 10, 17, 12, 15)
+    assert next_run('30 9 * * 1-5', 2026, 10, 17, 12, 0) == datetime(2026, 10, 19, 9, 30)
+
+def test_cron_is_strictly_after():
+    assert next_run('30 9 * * *', 2026, 10, 19, 9, 30) == datetime(2026, 10, 20, 9, 30)
+
+@pytest.mark.parametrize("weekday", ['0', '7'])
+def test_cron_zero_and_seven_are_sunday(weekday):
+    assert next_run(f'0 9 * * {weekday}', 2026, 10, 17, 12, 0) == datetime(2026, 10, 18, 9, 0)
+
+def test_cron_day_of_month_or_day_of_week():
+    # 2026-10-02 is a Friday; restricting both day fields matches either
+    assert next_run('0 0 13 * 5', 2026, 10, 1, 0, 0) == datetime(2026, 10, 2, 0, 0)
+    assert next_run('0 0 13 * *', 2026, 10, 1, 0, 0) == datetime(2026, 10, 13, 0, 0)
+    assert next_run('0 0 * * 5', 2026, 10, 3, 0, 0) == datetime(2026, 10, 9, 0, 0)
+
+def test_cron_month_rollover():
+    assert next_run('0 0 1 * *', 2026, 12, 15, 0, 0) == datetime(2027, 1, 1, 0, 0)
+    assert next_run('0 0 29 2 *', 2026, 10, 17, 0, 0) == datetime(2028, 2, 29, 0, 0)
+
+def test_cron_aliases():
+    assert next_run('@hourly', 2026, 10, 17, 10, 20) == datetime(2026, 10, 17, 11, 0)
+    assert next_run('@weekly', 2026, 10, 17, 10, 20) == datetime(2026, 10, 18, 0, 0)
+    assert next_run('@monthly', 2026, 10, 17, 10, 20) == datetime(2026, 11, 1, 0, 0)
+
+def test_cron_never_matches():
+    with pytest.raises(ValueError):
+        CronTrigger('0 0 31 2 *').next_after(ts(2026, 10, 17))
+
+def test_interval_trigger():
+    assert IntervalTrigger(60).next_after(1000.0) == 1060.0
+    with pytest.raises(ValueError):
+        IntervalTrigger(0)
+
+@pytest.mark.parametrize("options", [
+    {"interval_seconds": 1e10},
+    {"interval_seconds": float('inf')},
+    {"interval_seconds": float('nan')},
+    {"interval_seconds": -5},
+    {"interval_seconds": 60, "jitter_seconds": 1e300},
+    {"interval_seconds": 60, "jitter_seconds": float('nan')},
+    {"interval_seconds": 60, "jitter_seconds": -1}
+])
+def test_schedule_rejects_out_of_range_seconds(options):
+    with pytest.raises(ValueError):
+        Schedule('s', 'site.yml', **options)
+
+@pytest.fixture
+def runs():
+    """Stub launch/is_running: every launch stays running until finished"""
+    class Runs:
+        def __init__(self):
+            self.launched = []
+            self.running = set()
+
+        def launch(self, schedule):
+            execution_id = f"exec-{len(self.launched)}"
+            self.launched.append(execution_id)
+            self.running.add(execution_id)
+            return execution_id
+
+        def is_running(self, execution_id):
+            return execution_id in self.running
+
+        def finish_all(self):
+            self.running.clear()
+
+    return Runs()
+
+@pytest.fixture
+def scheduler(tmp_path, runs):
+    return PlaybookScheduler(str(tmp_path / 'schedules.json'), runs.launch, runs.is_running)
+
+def add(scheduler, **options):
+    schedule = Schedule(f"s{len(scheduler.schedules)}", 'site.yml', **options)
+    scheduler.schedules[schedule.schedule_id] = schedule
+    return schedule
+
+def test_arm_jitter_does_not_drift(scheduler, monkeypatch):
+    monkeypatch.setattr(playbook_scheduler.random, 'uniform', lambda low, high: high)
+    schedule = add(scheduler, interval_seconds=60, jitter_seconds=30)
+
+    with scheduler._cond:
+        scheduler._arm(schedule, 1000.0)
+        assert (schedule.next_base, schedule.next_run) == (1060.0, 1090.0)
+        scheduler._arm(schedule, schedule.next_run)
+        assert (schedule.next_base, schedule.next_run) == (1120.0, 1150.0)
+
+def test_arm_skips_missed_runs(scheduler):
+    schedule = add(scheduler, interval_seconds=60)
+
+    with scheduler._cond:
+        scheduler._arm(schedule, 1000.0)
+        scheduler._arm(schedule, 5000.0)
+    assert schedule.next_base == 5060.0
+
+def test_fire_skip_policy(scheduler, runs):
+    schedule = add(scheduler, interval_seconds=60, overlap='skip')
+
+    with scheduler._cond:
+        scheduler._fire(schedule, 'due')
+        scheduler._fire(schedule, 'due')
+        assert runs.launched == ['exec-0']
+        assert schedule.skipped_count == 1
+
+        runs.finish_all()
+        scheduler._fire(schedule, 'due')
+    assert runs.launched == ['exec-0', 'exec-1']
+    assert schedule.run_count == 2
+
+def test_fire_coalesce_policy(scheduler, runs):
+    schedule = add(scheduler, interval_seconds=60, overlap='coalesce')
+
+    with scheduler._cond:
+        scheduler._fire(schedule, 'due')
+        scheduler._fire(schedule, 'due')
+        scheduler._fire(schedule, 'due')
+        assert runs.launched == ['exec-0']
+        assert schedule.pending is True
+        assert schedule.coalesced_count == 1
+        assert [entry[4] for entry in scheduler._heap].count('retry') == 1
+
+        # Still running: the retry re-queues itself
+        scheduler._fire(schedule, 'retry')
+        assert runs.launched == ['exec-0']
+
+        runs.finish_all()
+        scheduler._fire(schedule, 'retry')
+        assert runs.launched == ['exec-0', 'exec-1']
+        assert schedule.pending is False
+
+        # Stale retries after the coalesced run started do nothing
+        scheduler._fire(schedule, 'retry')
+    assert runs.launched == ['exec-0', 'exec-1']
+
+def test_run_now_respects_active_run(scheduler, runs):
+    schedule = add(scheduler, interval_seconds=60, overlap='coalesce')
+
+    with scheduler._cond:
+        scheduler._fire(schedule, 'due')
+        scheduler._fire(schedule, 'due')
+    assert schedule.pending is True
+
+    with pytest.raises(ScheduleBusyError):
+        scheduler.run_now(schedule.schedule_id)
+    assert schedule.pending is True
+    assert runs.launched == ['exec-0']
+
+    runs.finish_all()
+    assert scheduler.run_now(schedule.schedule_id) is schedule
+    assert runs.launched == ['exec-0', 'exec-1']
+    assert scheduler.run_now('missing') is None
+
+def test_launch_error_is_recorded(scheduler):
+    def failing_launch(schedule):
+        raise FileNotFoundError("Playbook site.yml not found")
+
+    scheduler.launch = failing_launch
+    schedule = add(scheduler, interval_seconds=60)
+
+    with scheduler._cond:
+        scheduler._fire(schedule, 'due')
+    assert schedule.last_error == "Playbook site.yml not found"
+    assert schedule.run_count == 0
+
+def test_add_schedule_rejects_trigger_that_never_fires(scheduler, tmp_path):
+    with pytest.raises(ValueError):
+        scheduler.add_schedule('site.yml', cron='0 0 31 2 *')
+    with pytest.raises(ValueError):
+        scheduler.add_schedule('site.yml', cron='0 0 31 2 *', enabled=False)
+
+    assert scheduler.list_schedules() == []
+    assert not (tmp_path / 'schedules.json').exists()
+
+def test_enable_disable_cycles_do_not_grow_heap(scheduler):
+    schedule = scheduler.add_schedule('site.yml', cron='@yearly')
+    other = scheduler.add_schedule('site.yml', cron='@daily')
+
+    for _ in range(300):
+        scheduler.set_enabled(schedule.schedule_id, False)
+        scheduler.set_enabled(schedule.schedule_id, True)
+
+    assert len(scheduler._heap) <= 2 * len(scheduler.schedules) + playbook_scheduler.HEAP_COMPACT_SLACK + 1
+    live = [entry for entry in scheduler._heap
+            if entry[2] == schedule.schedule_id and entry[3] == schedule.generation]
+    assert [entry[0] for entry in live] == [schedule.next_run]
+    assert any(entry[2] == other.schedule_id for entry in scheduler._heap)
+
+def test_deleted_schedules_are_compacted(scheduler):
+    for _ in range(200):
+        scheduler.remove_schedule(scheduler.add_schedule('site.yml', cron='@yearly').schedule_id)
+
+    assert len(scheduler._heap) <= playbook_scheduler.HEAP_COMPACT_SLACK + 1
+
+def test_save_and_load_round_trip(scheduler, runs):
+    cron = scheduler.add_schedule('site.yml', cron='*/5 * * * *', name='every five',
+                                  extra_vars={'env': 'prod'}, jitter_seconds=10, overlap='coalesce')
+    interval = scheduler.add_schedule('monitor.yml', interval_seconds=300, enabled=False)
+    scheduler.run_now(cron.schedule_id)
+
+    reloaded = PlaybookScheduler(scheduler.schedules_file, runs.launch, runs.is_running)
+    reloaded.load_schedules()
+
+    def persisted(schedule):
+        data = schedule.to_dict()
+        del data['next_run'], data['pending']
+        return data
+
+    assert {s.schedule_id: persisted(s) for s in reloaded.list_schedules()} == {
+        cron.schedule_id: persisted(cron),
+        interval.schedule_id: persisted(interval)
+    }
+    assert reloaded.get_schedule(cron.schedule_id).run_count == 1
+
+def test_failed_save_leaves_existing_file_intact(scheduler, monkeypatch, tmp_path):
+    scheduler.add_schedule('site.yml', interval_seconds=60)
+    saved = (tmp_path / 'schedules.json').read_text()
+
+    def partial_dump(data, f, **kwargs):
+        f.write('{"schedules": [')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(playbook_scheduler.json, 'dump', partial_dump)
+    with pytest.raises(ScheduleStoreError):
+        scheduler.add_schedule('site.yml', interval_seconds=120)
+
+    assert (tmp_path / 'schedules.json').read_text() == saved
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['schedules.json']
+    assert len(scheduler.list_schedules()) == 1
+    assert "disk full" in scheduler.save_error
+
+def test_unwritable_store_rolls_back_changes(scheduler, tmp_path):
+    schedule = scheduler.add_schedule('site.yml', interval_seconds=60)
+    blocker = tmp_path / 'not-a-dir'
+    blocker.write_text('')
+    scheduler.schedules_file = str(blocker / 'schedules.json')
+
+    with pytest.raises(ScheduleStoreError):
+        scheduler.add_schedule('site.yml', interval_seconds=120)
+    with pytest.raises(ScheduleStoreError):
+        scheduler.remove_schedule(schedule.schedule_id)
+    with pytest.raises(ScheduleStoreError):
+        scheduler.set_enabled(schedule.schedule_id, False)
+
+    assert scheduler.list_schedules() == [schedule]
+    assert schedule.enabled is True
+    assert schedule.next_run is not None
+    assert scheduler.save_error
+
+def test_corrupt_file_is_moved_aside(tmp_path, runs):
+    schedules_file = tmp_path / 'schedules.json'
+    schedules_file.write_text('{"schedules": [{"schedule_id": "trunc')
+    scheduler = PlaybookScheduler(str(schedules_file), runs.launch, runs.is_running)
+
+    scheduler.load_schedules()
+    assert scheduler.list_schedules() == []
+    assert scheduler.load_error
+
+    backups = [path for path in tmp_path.iterdir() if path.name.startswith('schedules.json.corrupt-')]
+    assert len(backups) == 1
+    assert backups[0].read_text() == '{"schedules": [{"schedule_id": "trunc'
+
+    scheduler.add_schedule('site.yml', interval_seconds=60)
+    assert backups[0].exists()
+    assert len(json.loads(schedules_file.read_text())['schedules']) == 1
+
+def test_unreadable_file_is_not_replaced(tmp_path, runs):
+    schedules_file = tmp_path / 'schedules.json'
+    schedules_file.mkdir()
+    scheduler = PlaybookScheduler(str(schedules_file), runs.launch, runs.is_running)
+
+    with pytest.raises(ScheduleStoreError):
+        scheduler.start()
+    assert schedules_file.is_dir()
+    assert scheduler._thread is None
+
+def test_start_skips_bad_persisted_schedule(tmp_path, runs):
+    schedules_file = tmp_path / 'schedules.json'
+    schedules_file.write_text(json.dumps({'schedules': [
+        {'schedule_id': 'bad', 'playbook': 'site.yml', 'cron': '0 0 31 2 *'},
+        {'schedule_id': 'good', 'playbook': 'site.yml', 'interval_seconds': 60},
+        {'schedule_id': 'invalid', 'playbook': 'site.yml'}
+    ]}))
+    scheduler = PlaybookScheduler(str(schedules_file), runs.launch, runs.is_running)
+
+    scheduler.start()
+    try:
+        assert sorted(scheduler.schedules) == ['bad', 'good']
+        assert scheduler.get_schedule('bad').last_error
+        assert scheduler.get_schedule('bad').next_run is None
+        assert scheduler.get_schedule('good').next_run is not None
+    finally:
+        scheduler.stop()
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+def test_timer_survives_entry_beyond_wait_limit(scheduler, runs):
+    scheduler.start()
+    try:
+        far_future = Schedule('far', 'site.yml', interval_seconds=60)
+        with scheduler._cond:
+            scheduler._push(time.time() + 1e12, far_future, 'due')
+        time.sleep(0.05)
+
+        scheduler.add_schedule('site.yml', interval_seconds=0.05)
+        wait_for(lambda: runs.launched)
+        assert scheduler._thread.is_alive()
+    finally:
+        scheduler.stop()
+
+def test_timer_survives_loop_errors(scheduler, runs, monkeypatch):
+    monkeypatch.setattr(playbook_scheduler, 'ERROR_BACKOFF_SECONDS', 0.01)
+
+    class FailOnceDict(dict):
+        failed = False
+
+        def get(self, key, default=None):
+            if not self.failed:
+                self.failed = True
+                raise RuntimeError("lookup failed")
+            return super().get(key, default)
+
+    scheduler.schedules = FailOnceDict()
+    scheduler.start()
+    try:
+        # The entry being handled when the error hits is dropped; the thread keeps serving the rest
+        scheduler.add_schedule('site.yml', interval_seconds=0.05)
+        scheduler.add_schedule('site.yml', interval_seconds=0.05)
+        wait_for(lambda: runs.launched)
+        assert scheduler.schedules.failed
+        assert scheduler._thread.is_alive()
+    finally:
+        scheduler.stop()
@@ -0,0 +1,112 @@
+import os
+import threading
+
+import pytest
+
+@pytest.fixture
+def client(api_server):
+    with open(os.path.join(api_server.PLAYBOOKS_DIR, 'site.yml'), 'w') as f:
+        f.write('---\n')
+    client = api_server.create_app().test_client()
+    assert api_server.state_ready.wait(5)
+    return client
+
+def create(client, **fields):
+    return client.post('/api/schedules', json={"playbook": "site.yml", **fields})
+
+def test_schedule_lifecycle(client):
+    response = create(client, interval_seconds=300, name="hourly check")
+    assert response.status_code == 201
+    schedule = response.get_json()
+    schedule_id = schedule["schedule_id"]
+    assert schedule["next_run"] is not None
+
+    listed = client.get('/api/schedules').get_json()["schedules"]
+    assert [item["schedule_id"] for item in listed] == [schedule_id]
+    assert client.get(f'/api/schedules/{schedule_id}').get_json()["name"] == "hourly check"
+
+    disabled = client.post(f'/api/schedules/{schedule_id}/disable').get_json()
+    assert disabled["enabled"] is False
+    assert disabled["next_run"] is None
+
+    enabled = client.post(f'/api/schedules/{schedule_id}/enable').get_json()
+    assert enabled["enabled"] is True
+    assert enabled["next_run"] is not None
+
+    assert client.delete(f'/api/schedules/{schedule_id}').status_code == 200
+    assert client.get(f'/api/schedules/{schedule_id}').status_code == 404
+    assert client.delete(f'/api/schedules/{schedule_id}').status_code == 404
+
+@pytest.mark.parametrize("fields", [
+    {"cron": 5},
+    {"interval_seconds": "60"},
+    {"interval_seconds": True},
+    {"interval_seconds": 60, "jitter_seconds": "5"},
+    {"interval_seconds": 60, "enabled": "false"},
+    {"interval_seconds": 60, "extra_vars": ["a"]},
+    {"interval_seconds": 60, "overlap": "queue"},
+    {"interval_seconds": 60, "cron": "* * * * *"},
+    {},
+    {"cron": "not a cron"},
+    {"cron": "0 0 31 2 *"},
+    {"interval_seconds": 1e10},
+    {"interval_seconds": 60, "jitter_seconds": 1e300}
+])
+def test_create_schedule_rejects_invalid_fields(client, fields):
+    assert create(client, **fields).status_code == 400
+    assert client.get('/api/schedules').get_json()["schedules"] == []
+
+def test_create_schedule_requires_existing_playbook(client):
+    response = client.post('/api/schedules', json={"playbook": "missing.yml", "interval_seconds": 60})
+    assert response.status_code == 404
+
+def test_run_now_is_tracked_like_manual_runs(client, api_server, monkeypatch):
+    schedule_id = create(client, cron="@daily").get_json()["schedule_id"]
+
+    response = client.post(f'/api/schedules/{schedule_id}/run')
+    assert response.status_code == 200
+    execution_id = response.get_json()["execution_id"]
+
+    execution = client.get(f'/api/executions/{execution_id}').get_json()
+    assert execution["schedule_id"] == schedule_id
+    assert execution["playbook"] == "site.yml"
+
+    monkeypatch.setattr(api_server.scheduler, 'is_running', lambda execution_id: True)
+    assert client.post(f'/api/schedules/{schedule_id}/run').status_code == 409
+
+def test_schedule_endpoints_wait_for_ready(api_server, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(api_server, 'init_state', lambda: release.wait(5))
+    client = api_server.create_app().test_client()
+
+    try:
+        assert client.get('/api/schedules').status_code == 503
+        assert client.post('/api/schedules', json={"playbook": "site.yml", "interval_seconds": 60}).status_code == 503
+        assert client.get('/api/schedules/abc').status_code == 503
+        assert client.delete('/api/schedules/abc').status_code == 503
+        for action in ['enable', 'disable', 'run']:
+            assert client.post(f'/api/schedules/abc/{action}').status_code == 503
+    finally:
+        release.set()
+
+def test_save_failure_is_reported(client, api_server, tmp_path):
+    blocker = tmp_path / 'not-a-dir'
+    blocker.write_text('')
+    api_server.scheduler.schedules_file = str(blocker / 'schedules.json')
+
+    response = create(client, interval_seconds=60)
+    assert response.status_code == 500
+    assert "Could not save schedules" in response.get_json()["error"]
+    assert client.get('/api/schedules').get_json()["schedules"] == []
+    assert client.get('/api/ready').get_json()["schedules_save_error"]
+
+def test_ready_reports_moved_aside_schedules_file(api_server):
+    with open(api_server.scheduler.schedules_file, 'w') as f:
+        f.write('not json')
+
+    client = api_server.create_app().test_client()
+    assert api_server.state_ready.wait(5)
+
+    ready = client.get('/api/ready').get_json()
+    assert ready["schedules_load_error"]
+    assert ready["schedules_file"] == api_server.scheduler.schedules_file
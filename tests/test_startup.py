@@ -0,0 +1,129 @@
+import json
+import subprocess
+import sys
+import threading
+import time
+
+from conftest import API_DIR
+
+# Budgets for what api_server adds on top of importing Flask (measured at a few
+# milliseconds each), so any work moved back to import time fails the benchmark
+IMPORT_BUDGET_SECONDS = 0.05
+CREATE_APP_BUDGET_SECONDS = 0.025
+HEALTH_BUDGET_SECONDS = 0.1
+
+BENCHMARK_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import flask, flask_cors
+dependencies = time.perf_counter()
+import api_server
+imported = time.perf_counter()
+api_server.log_dir = sys.argv[1]
+api_server.scheduler.schedules_file = sys.argv[2]
+app = api_server.create_app()
+created = time.perf_counter()
+response = app.test_client().get('/api/health')
+answered = time.perf_counter()
+print(json.dumps({
+    "dependencies": dependencies - start,
+    "import": imported - dependencies,
+    "create_app": created - imported,
+    "health": answered - created,
+    "status": response.status_code
+}))
+'''
+
+def test_startup_time_benchmark(tmp_path):
+    result = subprocess.run(
+        [sys.executable, '-c', BENCHMARK_SCRIPT, str(tmp_path / 'logs'), str(tmp_path / 'schedules.json')],
+        cwd=API_DIR, capture_output=True, text=True, timeout=30, check=True
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert timings["status"] == 200
+    assert timings["import"] < IMPORT_BUDGET_SECONDS, timings
+    assert timings["create_app"] < CREATE_APP_BUDGET_SECONDS, timings
+    assert timings["health"] < HEALTH_BUDGET_SECONDS, timings
+
+def test_health_answers_before_ready(api_server, monkeypatch):
+    release = threading.Event()
+    original_init_state = api_server.init_state
+
+    def blocked_init_state():
+        release.wait(5)
+        original_init_state()
+
+    monkeypatch.setattr(api_server, 'init_state', blocked_init_state)
+    client = api_server.create_app().test_client()
+
+    response = client.get('/api/health')
+    assert response.status_code == 200
+    assert response.get_json()["ready"] is False
+    assert client.get('/api/ready').status_code == 503
+    assert client.post('/api/execute', json={"playbook": "site.yml"}).status_code == 503
+
+    release.set()
+    assert api_server.state_ready.wait(5)
+
+    response = client.get('/api/ready')
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "ready"
+    assert client.get('/api/health').get_json()["ready"] is True
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+def test_initialization_is_retried_until_it_succeeds(api_server, monkeypatch, tmp_path):
+    blocker = tmp_path / 'not-a-dir'
+    blocker.write_text('')
+    monkeypatch.setattr(api_server, 'log_dir', str(blocker / 'logs'))
+    monkeypatch.setattr(api_server, 'INIT_RETRY_SECONDS', 0.01)
+
+    client = api_server.create_app().test_client()
+    wait_for(lambda: api_server.startup_info["attempts"] >= 2)
+
+    response = client.get('/api/ready')
+    assert response.status_code == 503
+    assert response.get_json()["error"]
+    health = client.get('/api/health').get_json()
+    assert health["status"] == "degraded"
+    assert health["init_error"]
+
+    monkeypatch.setattr(api_server, 'log_dir', str(tmp_path / 'logs'))
+    assert api_server.state_ready.wait(5)
+    assert client.get('/api/ready').status_code == 200
+    health = client.get('/api/health').get_json()
+    assert health["status"] == "healthy"
+    assert health["init_error"] is None
+
+def test_team_auth_loads_tokens_on_first_use(tmp_path, monkeypatch):
+    import team_auth
+
+    tokens_file = tmp_path / 'team_tokens.json'
+    tokens_file.write_text(json.dumps({
+        'tokens': {},
+        'team_members': {'alice': {'password_hash': 'x', 'role': 'viewer', 'email': 'alice@company.com'}}
+    }))
+    monkeypatch.setattr(team_auth, 'TEAM_TOKENS_FILE', str(tokens_file))
+
+    loads = []
+    original_load_tokens = team_auth.TeamAuth.load_tokens
+
+    def counting_load_tokens(self):
+        loads.append(self)
+        original_load_tokens(self)
+
+    monkeypatch.setattr(team_auth.TeamAuth, 'load_tokens', counting_load_tokens)
+
+    auth = team_auth.TeamAuth()
+    assert loads == []
+    assert auth.loaded is False
+    assert 'alice' not in auth.team_members
+
+    assert 'alice' in auth.list_team_members()
+    auth.list_team_members()
+    assert len(loads) == 1